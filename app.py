@@ -1,11 +1,33 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import os
 import json
 import urllib.request
+from typing import NamedTuple, Optional
+
+# Unified age-group columns built from the Biometric, Demographic and Enrolment datasets
+AGE_5_17_COL = 'unified_age_5_17'
+AGE_17_PLUS_COL = 'unified_age_17_plus'
+
+# Normalize and Combine Columns from different datasets
+# We want to aggregate metrics from Biometric, Demographic, and Enrolment data
+# Note: Enrolment has age_18_greater which is close enough to 17+
+UNIFIED_AGE_SOURCES = {
+    AGE_5_17_COL: ('bio_age_5_17', 'demo_age_5_17', 'age_5_17'),
+    AGE_17_PLUS_COL: ('bio_age_17_', 'demo_age_17_', 'age_18_greater'),
+}
+
+# Rows sent to the browser per page of the raw data table
+RAW_DATA_PAGE_SIZE = 1000
 
 # Page configuration
 st.set_page_config(
@@ -95,6 +117,33 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+def add_unified_age_columns(table):
+    """Append the unified age-group columns so every table shares them before concatenation"""
+    for unified_col, source_cols in UNIFIED_AGE_SOURCES.items():
+        total = pa.array(np.zeros(table.num_rows, dtype=np.int64))
+        for col in source_cols:
+            if col in table.column_names:
+                total = pc.add(total, pc.fill_null(table[col], 0))
+        table = table.append_column(unified_col, total)
+    return table
+
+def read_csv_table(source):
+    """Parse a local CSV file or URL into an Arrow table with the multithreaded Arrow reader"""
+    # Skip malformed rows instead of failing the whole file
+    parse_options = pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip')
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(source) as response:
+            table = pacsv.read_csv(response, parse_options=parse_options)
+    else:
+        table = pacsv.read_csv(source, parse_options=parse_options)
+    
+    # Parse dates here so each file is converted in its own reader thread;
+    # unparseable values become missing, as with errors='coerce'
+    if 'date' in table.column_names and pa.types.is_string(table.schema.field('date').type):
+        dates = pc.strptime(table['date'], format='%d-%m-%Y', unit='ns', error_is_null=True)
+        table = table.set_column(table.schema.get_field_index('date'), 'date', dates)
+    return add_unified_age_columns(table)
+
 @st.cache_data
 def load_data():
     """Load all CSV data files"""
@@ -126,35 +175,254 @@ def load_data():
     all_sources = data_files + EXTERNAL_DATA_URLS
     
     if all_sources:
-        dfs = []
-        for source in all_sources:
+        # Parse sources concurrently; the Arrow reader releases the GIL while parsing
+        with ThreadPoolExecutor(max_workers=min(8, len(all_sources))) as executor:
+            futures = [executor.submit(read_csv_table, source) for source in all_sources]
+        
+        # Collect results on the script thread so warnings reach the page
+        tables = []
+        for source, future in zip(all_sources, futures):
             try:
-                # pandas read_csv handles both local paths and URLs
-                df = pd.read_csv(source, on_bad_lines='skip')
-                if not df.empty:
-                    dfs.append(df)
+                table = future.result()
+                if table.num_rows > 0:
+                    tables.append(table)
             except Exception as e:
                 st.warning(f"Could not load {source}: {e}")
         
-        if dfs:
-            combined_df = pd.concat(dfs, ignore_index=True)
-            if 'date' in combined_df.columns:
-                combined_df['date'] = pd.to_datetime(combined_df['date'], format='%d-%m-%Y', errors='coerce')
+        if tables:
+            # Arrow concatenation only stitches chunks together; columns missing from a
+            # dataset are filled with nulls and differing numeric types are widened
+            combined_table = pa.concat_tables(tables, promote_options='permissive')
+            # Keep the unified columns last, after every dataset's own columns
+            unified_cols = list(UNIFIED_AGE_SOURCES)
+            combined_table = combined_table.select(
+                [col for col in combined_table.column_names if col not in unified_cols] + unified_cols
+            )
+            combined_df = combined_table.to_pandas()
+            
+            # Compact dtypes: categorical keys group on integer codes and counts fit small unsigned ints
+            for col in ('state', 'district', 'pincode'):
+                if col in combined_df.columns:
+                    combined_df[col] = combined_df[col].astype('category')
+            for col in (AGE_5_17_COL, AGE_17_PLUS_COL):
+                combined_df[col] = pd.to_numeric(combined_df[col], downcast='unsigned')
             return combined_df
     
     return pd.DataFrame()
 
+def filter_data(df, date_start=None, date_end=None, state='All', district='All'):
+    """Apply the sidebar filters with a single boolean mask"""
+    # Deliberately uncached: masking the loaded frame is cheaper than unpickling a cached slice
+    mask = pd.Series(True, index=df.index)
+    if date_start is not None and date_end is not None:
+        mask &= (df['date'] >= pd.Timestamp(date_start)) & (df['date'] <= pd.Timestamp(date_end))
+    if state != 'All':
+        mask &= df['state'] == state
+    if district != 'All':
+        mask &= df['district'] == district
+    return df[mask]
+
+@st.cache_data(max_entries=16)
+def filter_options(date_start=None, date_end=None):
+    """Sorted states, and sorted districts per state, present in the selected date range"""
+    df = filter_data(load_data(), date_start, date_end)
+    states = sorted(df['state'].dropna().unique().tolist())
+    
+    districts_by_state = {}
+    if 'district' in df.columns:
+        pairs = df.groupby(['state', 'district'], observed=True).size().index
+        for state, district in pairs:
+            districts_by_state.setdefault(state, []).append(district)
+        districts_by_state = {state: sorted(districts) for state, districts in districts_by_state.items()}
+    return states, districts_by_state
+
+class Aggregates(NamedTuple):
+    """Pre-aggregated views of the filtered data shared by all tabs"""
+    by_state: Optional[pd.DataFrame]
+    by_district: Optional[pd.DataFrame]
+    by_date: Optional[pd.DataFrame]
+    by_state_district: Optional[pd.DataFrame]
+    by_date_state: Optional[pd.DataFrame]
+
+def aggregate_by(df, keys, distinct_cols=()):
+    """Group once by keys, summing both age groups, counting records and, optionally, distinct values"""
+    if not all(key in df.columns for key in keys):
+        return None
+    
+    named_aggs = {
+        AGE_5_17_COL: (AGE_5_17_COL, 'sum'),
+        AGE_17_PLUS_COL: (AGE_17_PLUS_COL, 'sum'),
+        'records': (AGE_5_17_COL, 'size'),
+    }
+    # Distinct counts are the costliest part, so only views that display them ask for them
+    for col in distinct_cols:
+        if col in df.columns:
+            named_aggs[col] = (col, 'nunique')
+    
+    grouped = df.groupby(keys, as_index=False, observed=True).agg(**named_aggs)
+    # Plotly Express treats unsigned columns as discrete colors, so widen the small sums
+    grouped = grouped.astype({AGE_5_17_COL: 'int64', AGE_17_PLUS_COL: 'int64'})
+    grouped['total'] = grouped[AGE_5_17_COL] + grouped[AGE_17_PLUS_COL]
+    return grouped
+
+@st.cache_data
+def build_aggregates(df):
+    """Compute every grouping used by the dashboard tabs in a single pass per key set"""
+    by_state_district = aggregate_by(df, ['state', 'district'])
+    
+    # District sums are additive, so roll them up from the small state/district view
+    by_district = None
+    if by_state_district is not None:
+        by_district = by_state_district.groupby('district', as_index=False, observed=True)[
+            [AGE_5_17_COL, AGE_17_PLUS_COL, 'records', 'total']
+        ].sum()
+    
+    return Aggregates(
+        by_state=aggregate_by(df, ['state'], distinct_cols=('district', 'pincode')),
+        by_district=by_district,
+        by_date=aggregate_by(df, ['date']),
+        by_state_district=by_state_district,
+        by_date_state=aggregate_by(df, ['date', 'state']),
+    )
+
 @st.cache_data
+def state_details(by_state, by_state_district):
+    """Per-state deep-dive figures from the shared aggregates, keyed by state so a map click is a dictionary lookup"""
+    district_counts = {}
+    if by_state_district is not None:
+        for state, state_districts in by_state_district.groupby('state', observed=True):
+            district_counts[state] = state_districts.set_index('district')['records']
+    
+    details = {}
+    state_rows = by_state[['state', 'records', AGE_5_17_COL, AGE_17_PLUS_COL, 'total']]
+    for state, records, age_5_17, age_17_plus, total in state_rows.itertuples(index=False):
+        details[state] = {
+            'records': records,
+            'age_5_17': age_5_17,
+            'age_17_plus': age_17_plus,
+            'authentications': total,
+            'districts': district_counts.get(state),
+        }
+    return details
+
+def lttb_downsample(x, y, n_out=2000):
+    """Largest-Triangle-Three-Buckets downsampling; returns the indices of the points to keep"""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Third vertex of the triangle is the average of the next bucket
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(area.argmax())
+        keep[i + 1] = prev
+    
+    return keep
+
+def to_csv_bytes(df):
+    """Serialize data for download; called on click, so the bytes are not kept between downloads"""
+    return df.to_csv(index=False).encode('utf-8')
+
+def session_figure(key, build):
+    """Return this session's figure for key, building it (layout and empty traces) on first use"""
+    # Kept per session rather than per process so concurrent users never share a mutable figure
+    state_key = f"{key}_figure"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = build()
+    return st.session_state[state_key]
+
+def build_trend_figure():
+    """Daily Authentication Trends layout with one empty trace per age group"""
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        name='Age 5-17',
+        mode='lines+markers',
+        line=dict(color='#09447d', width=3)
+    ))
+    fig.add_trace(go.Scattergl(
+        name='Age 17+',
+        mode='lines+markers',
+        line=dict(color='#f39c12', width=3)
+    ))
+    
+    fig.update_layout(
+        title='Daily Authentication Trends',
+        xaxis_title='Date',
+        yaxis_title='Number of Authentications',
+        hovermode='x unified',
+        height=400,
+        template="plotly_white",
+        title_font=dict(size=18, color='#09447d', family="Segoe UI"),
+        font=dict(color="#333"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+def build_time_heatmap_figure():
+    """Temporal Heatmap layout with an empty week x state heatmap trace"""
+    fig = go.Figure(go.Heatmap(
+        colorscale='Magma',
+        colorbar=dict(title='count')
+    ))
+    fig.update_layout(
+        title="Temporal Heatmap: Weekly Activity by State",
+        xaxis_title='week',
+        yaxis_title='state',
+        height=500
+    )
+    return fig
+
+@st.cache_resource
 def load_geojson():
-    """Load India States GeoJSON"""
+    """Load India States GeoJSON, keeping a local copy so it is only downloaded once"""
     url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
+    local_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'india_states.geojson')
+    
+    if os.path.exists(local_path):
+        try:
+            with open(local_path, encoding='utf-8') as f:
+                geojson = json.load(f)
+            if isinstance(geojson, dict) and 'features' in geojson:
+                return geojson
+        except (OSError, ValueError):
+            pass
+        # A corrupt or unexpected cache file is treated as missing and downloaded again
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+    
+    # Failures raise so that st.cache_resource does not pin a missing map for the whole process
+    with urllib.request.urlopen(url) as response:
+        raw = response.read()
+    
+    # Parse before caching so an error page or truncated body is never written to disk
+    geojson = json.loads(raw)
+    if not isinstance(geojson, dict) or 'features' not in geojson:
+        raise ValueError("Downloaded file is not a GeoJSON FeatureCollection")
+    
     try:
-        with urllib.request.urlopen(url) as response:
-            geojson = json.load(response)
-        return geojson
-    except Exception as e:
-        st.error(f"Error loading GeoJSON: {e}")
-        return None
+        tmp_path = local_path + '.part'
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, local_path)
+    except OSError:
+        pass # Read-only deployments just keep the shared in-memory copy
+    
+    return geojson
 
 def main():
     # Header Section
@@ -180,6 +448,10 @@ def main():
     st.sidebar.info("Authorized Personnel Only")
 
     
+    # Read every filter first, then apply them to the loaded frame in one pass
+    date_start, date_end = None, None
+    selected_state, selected_district = 'All', 'All'
+    
     # Date filter
     if 'date' in df.columns and not df['date'].isna().all():
         date_range = st.sidebar.date_input(
@@ -190,54 +462,35 @@ def main():
         )
         
         if len(date_range) == 2:
-            df = df[(df['date'] >= pd.Timestamp(date_range[0])) & 
-                   (df['date'] <= pd.Timestamp(date_range[1]))]
+            date_start, date_end = date_range
     
     # State filter
     if 'state' in df.columns:
-        states = ['All'] + sorted(df['state'].dropna().unique().tolist())
+        state_options, district_options = filter_options(date_start, date_end)
+        states = ['All'] + state_options
         selected_state = st.sidebar.selectbox("Select State", states)
-        
-        if selected_state != 'All':
-            df = df[df['state'] == selected_state]
     
     # District filter
     if 'district' in df.columns and selected_state != 'All':
-        districts = ['All'] + sorted(df['district'].dropna().unique().tolist())
+        districts = ['All'] + district_options.get(selected_state, [])
         selected_district = st.sidebar.selectbox("Select District", districts)
-        
-        if selected_district != 'All':
-            df = df[df['district'] == selected_district]
+    
+    if date_start is not None or selected_state != 'All':
+        df = filter_data(df, date_start, date_end, selected_state, selected_district)
     
     # Calculate metrics
     total_records = len(df)
     
-    # Normalize and Combine Columns from different datasets
-    # We want to aggregate metrics from Biometric, Demographic, and Enrolment data
-    
-    # 1. 5-17 Age Group
-    # Candidates: bio_age_5_17, demo_age_5_17, age_5_17
-    c1 = df['bio_age_5_17'] if 'bio_age_5_17' in df.columns else 0
-    c2 = df['demo_age_5_17'] if 'demo_age_5_17' in df.columns else 0
-    c3 = df['age_5_17'] if 'age_5_17' in df.columns else 0
-    
-    # Create unified column
-    def get_col_safe(col_name):
-        return df[col_name].fillna(0) if col_name in df.columns else 0
-
-    df['unified_age_5_17'] = get_col_safe('bio_age_5_17') + get_col_safe('demo_age_5_17') + get_col_safe('age_5_17')
+    # Unified columns are built at load time from the Biometric, Demographic and Enrolment data
+    age_5_17_col = AGE_5_17_COL
+    age_17_plus_col = AGE_17_PLUS_COL
     
-    # 2. 17+ Age Group
-    # Candidates: bio_age_17_, demo_age_17_, age_18_greater
-    # Note: Enrolment has age_18_greater which is close enough to 17+
-    df['unified_age_17_plus'] = get_col_safe('bio_age_17_') + get_col_safe('demo_age_17_') + get_col_safe('age_18_greater')
+    # Group the filtered data once; every tab slices these small frames
+    aggs = build_aggregates(df)
     
-    # Use these unified columns for metrics
-    age_5_17_col = 'unified_age_5_17'
-    age_17_plus_col = 'unified_age_17_plus'
-    
-    total_age_5_17 = df[age_5_17_col].sum()
-    total_age_17_plus = df[age_17_plus_col].sum()
+    # One NumPy reduction over both compact count columns, accumulated in int64
+    age_totals = df[[age_5_17_col, age_17_plus_col]].to_numpy().sum(axis=0, dtype=np.int64)
+    total_age_5_17, total_age_17_plus = age_totals.tolist()
     total_authentications = total_age_5_17 + total_age_17_plus
     
     # Display key metrics
@@ -282,13 +535,8 @@ def main():
         
         with col1:
             # Top 10 states by authentications
-            if 'state' in df.columns:
-                state_data = df.groupby('state').agg({
-                    age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                    age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0
-                }).reset_index()
-                state_data['total'] = state_data[age_5_17_col] + state_data[age_17_plus_col]
-                state_data = state_data.nlargest(10, 'total')
+            if aggs.by_state is not None:
+                state_data = aggs.by_state.nlargest(10, 'total')
                 
                 
                 fig = px.bar(
@@ -307,7 +555,7 @@ def main():
                     title_font=dict(size=18, color='#09447d', family="Segoe UI"),
                     font=dict(color="#333"),
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="top_states")
         
         with col2:
             # Age group distribution pie chart
@@ -329,45 +577,27 @@ def main():
                 title_font=dict(size=18, color='#09447d', family="Segoe UI"),
                 font=dict(color="#333"),
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, key="age_distribution")
         
         # Time series if date is available
-        if 'date' in df.columns and not df['date'].isna().all():
+        if aggs.by_date is not None and not aggs.by_date.empty:
             st.subheader("📅 Authentication Trends Over Time")
             
-            time_data = df.groupby('date').agg({
-                age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0
-            }).reset_index()
+            time_data = aggs.by_date
             
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=time_data['date'],
-                y=time_data[age_5_17_col],
-                name='Age 5-17',
-                mode='lines+markers',
-                line=dict(color='#09447d', width=3)
-            ))
-            fig.add_trace(go.Scatter(
-                x=time_data['date'],
-                y=time_data[age_17_plus_col],
-                name='Age 17+',
-                mode='lines+markers',
-                line=dict(color='#f39c12', width=3)
-            ))
+            # Downsample long date ranges so the payload stays small while keeping the trend shape
+            date_ns = time_data['date'].to_numpy().astype(np.int64)
+            keep_5_17 = lttb_downsample(date_ns, time_data[age_5_17_col].to_numpy())
+            keep_17_plus = lttb_downsample(date_ns, time_data[age_17_plus_col].to_numpy())
             
-            fig.update_layout(
-                title='Daily Authentication Trends',
-                xaxis_title='Date',
-                yaxis_title='Number of Authentications',
-                hovermode='x unified',
-                height=400,
-                template="plotly_white",
-                title_font=dict(size=18, color='#09447d', family="Segoe UI"),
-                font=dict(color="#333"),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            # Only the trace data changes between reruns; the layout is built once per session
+            fig = session_figure('daily_trends', build_trend_figure)
+            with fig.batch_update():
+                fig.data[0].x = time_data['date'].iloc[keep_5_17]
+                fig.data[0].y = time_data[age_5_17_col].iloc[keep_5_17]
+                fig.data[1].x = time_data['date'].iloc[keep_17_plus]
+                fig.data[1].y = time_data[age_17_plus_col].iloc[keep_17_plus]
+            st.plotly_chart(fig, use_container_width=True, key="daily_trends")
     
     with tab2:
         st.subheader("🗺️ Geographic Distribution")
@@ -376,13 +606,8 @@ def main():
         
         with col1:
             # Top districts
-            if 'district' in df.columns:
-                district_data = df.groupby('district').agg({
-                    age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                    age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0
-                }).reset_index()
-                district_data['total'] = district_data[age_5_17_col] + district_data[age_17_plus_col]
-                district_data = district_data.nlargest(15, 'total')
+            if aggs.by_district is not None:
+                district_data = aggs.by_district.nlargest(15, 'total')
                 
                 fig = px.bar(
                     district_data,
@@ -399,18 +624,12 @@ def main():
                     template="plotly_white",
                     title_font=dict(size=18, color='#09447d', family="Segoe UI"),
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="top_districts")
         
         with col2:
             # State-wise breakdown
-            if 'state' in df.columns:
-                state_summary = df.groupby('state').agg({
-                    age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                    age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0,
-                    'district': 'nunique'
-                }).reset_index()
-                state_summary['total'] = state_summary[age_5_17_col] + state_summary[age_17_plus_col]
-                state_summary = state_summary.nlargest(15, 'total')
+            if aggs.by_state is not None and 'district' in aggs.by_state.columns:
+                state_summary = aggs.by_state.nlargest(15, 'total')
                 
                 fig = px.scatter(
                     state_summary,
@@ -428,7 +647,7 @@ def main():
                     template="plotly_white",
                     title_font=dict(size=18, color='#09447d', family="Segoe UI"),
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="state_districts_scatter")
     
     with tab3:
         st.subheader("📊 Age Group Analysis")
@@ -437,12 +656,8 @@ def main():
         
         with col1:
             # State-wise age distribution
-            if 'state' in df.columns:
-                state_age = df.groupby('state').agg({
-                    age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                    age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0
-                }).reset_index()
-                state_age = state_age.nlargest(10, age_5_17_col)
+            if aggs.by_state is not None:
+                state_age = aggs.by_state.nlargest(10, age_5_17_col)
                 
                 fig = go.Figure()
                 fig.add_trace(go.Bar(
@@ -467,16 +682,12 @@ def main():
                     template="plotly_white",
                     title_font=dict(size=18, color='#09447d', family="Segoe UI"),
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="state_age_comparison")
         
         with col2:
             # Age ratio by state
-            if 'state' in df.columns:
-                state_ratio = df.groupby('state').agg({
-                    age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                    age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0
-                }).reset_index()
-                state_ratio['total'] = state_ratio[age_5_17_col] + state_ratio[age_17_plus_col]
+            if aggs.by_state is not None:
+                state_ratio = aggs.by_state.copy()
                 state_ratio['ratio_5_17'] = (state_ratio[age_5_17_col] / state_ratio['total'] * 100).round(2)
                 state_ratio = state_ratio.nlargest(10, 'total')
                 
@@ -494,33 +705,32 @@ def main():
                     template="plotly_white",
                     title_font=dict(size=18, color='#09447d', family="Segoe UI"),
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="state_age_ratio")
     
     with tab4:
         st.subheader("📋 Raw Data")
         
         # Add summary statistics
         st.write("**Summary Statistics:**")
-        summary_df = df.groupby('state').agg({
-            age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-            age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0,
-            'district': 'nunique',
-            'pincode': 'nunique'
-        }).reset_index()
-        summary_df.columns = ['State', 'Age 5-17', 'Age 17+', 'Districts', 'Pincodes']
-        summary_df['Total'] = summary_df['Age 5-17'] + summary_df['Age 17+']
+        summary_df = aggs.by_state[['state', age_5_17_col, age_17_plus_col, 'district', 'pincode', 'total']].copy()
+        summary_df.columns = ['State', 'Age 5-17', 'Age 17+', 'Districts', 'Pincodes', 'Total']
         summary_df = summary_df.sort_values('Total', ascending=False)
         
         st.dataframe(summary_df, use_container_width=True, height=300)
         
         st.write("**Detailed Data:**")
-        st.dataframe(df, use_container_width=True, height=400)
+        # Only the current page is serialized to the browser on each rerun
+        page_count = max(1, -(-len(df) // RAW_DATA_PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        page_start = (page - 1) * RAW_DATA_PAGE_SIZE
+        st.dataframe(df.iloc[page_start:page_start + RAW_DATA_PAGE_SIZE], use_container_width=True, height=400)
+        st.caption(f"Page {page:,} of {page_count:,} ({total_records:,} rows, {RAW_DATA_PAGE_SIZE:,} per page)")
         
         # Download button
-        csv = df.to_csv(index=False)
+        # The CSV is only serialized when the button is clicked
         st.download_button(
             label="📥 Download Filtered Data as CSV",
-            data=csv,
+            data=partial(to_csv_bytes, df),
             file_name=f"uidai_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv"
         )
@@ -528,45 +738,26 @@ def main():
     with tab5:
         st.subheader("🇮🇳 India Zone Map & Heatmaps")
         
-        geojson = load_geojson()
+        try:
+            geojson = load_geojson()
+        except Exception as e:
+            st.error(f"Error loading GeoJSON: {e}")
+            geojson = None
         
-        if geojson and 'state' in df.columns:
+        if geojson and aggs.by_state is not None:
             # Prepare data for map
-            map_data = df.groupby('state').agg({
-                age_5_17_col: 'sum' if age_5_17_col else lambda x: 0,
-                age_17_plus_col: 'sum' if age_17_plus_col else lambda x: 0
-            }).reset_index()
-            map_data['total'] = map_data[age_5_17_col] + map_data[age_17_plus_col]
+            map_data = aggs.by_state.copy()
             
             # Determine Zones
             # Quantiles for 33% and 66%
             low_threshold = map_data['total'].quantile(0.33)
             high_threshold = map_data['total'].quantile(0.66)
             
-            def get_zone(val):
-                if val <= low_threshold:
-                    return 'Yellow' # Low activity -> Yellow (Caution/Low) or maybe Red? User asked for Red, Green, Yellow. Usually High is Green. 
-                    # Let's assume High Volume = Green, Medium = Yellow, Low = Red? Or usually performance: Good = Green.
-                    # If "performance" means "more authentications is better", then High = Green.
-                    # if "performance" means "load", might be different. 
-                    # I will assume More Authentications = Better/Active -> Green.
-                    # Low Authentications -> Red.
-                elif val <= high_threshold:
-                    return 'Yellow'
-                else:
-                    return 'Green'
-
-            # Let's refine the zones logic to match exactly "Red, Green and Yellow zones"
             # Low = Red, Medium = Yellow, High = Green
-            def get_zone_color_val(val):
-                if val <= low_threshold:
-                    return 'Low Activity (Red)'
-                elif val <= high_threshold:
-                    return 'Medium Activity (Yellow)'
-                else:
-                    return 'High Activity (Green)'
-            
-            map_data['Zone'] = map_data['total'].apply(get_zone_color_val)
+            # searchsorted keeps the "<= threshold" boundaries and, unlike pd.cut,
+            # tolerates equal thresholds when only one state is in the filter
+            zone_labels = np.array(['Low Activity (Red)', 'Medium Activity (Yellow)', 'High Activity (Green)'])
+            map_data['Zone'] = zone_labels[np.searchsorted([low_threshold, high_threshold], map_data['total'], side='left')]
             
             # Map Zones to Colors explicitly
             color_discrete_map = {
@@ -616,16 +807,19 @@ def main():
             # but for our config locations='state', it should be in point['location']
             selected_state = map_event["selection"]["points"][0].get("location")
         
-        if selected_state:
+        # Deep-dive figures for every state are computed once per filter selection
+        details = None
+        if selected_state and aggs.by_state is not None:
+            details = state_details(aggs.by_state, aggs.by_state_district).get(selected_state)
+        
+        if details:
             st.divider()
             st.markdown(f"## 📊 Deep Dive: {selected_state}")
             
-            state_df = df[df['state'] == selected_state]
-            
             # Metrics for State
-            s_total = len(state_df)
-            s_auth = state_df[age_5_17_col].sum() + state_df[age_17_plus_col].sum() if age_5_17_col and age_17_plus_col else 0
-            s_districts = state_df['district'].nunique() if 'district' in state_df.columns else 0
+            s_total = details['records']
+            s_auth = details['authentications']
+            s_districts = len(details['districts']) if details['districts'] is not None else 0
             
             m1, m2, m3 = st.columns(3)
             m1.metric("Total Records", f"{s_total:,}")
@@ -636,19 +830,19 @@ def main():
             dc1, dc2 = st.columns(2)
             
             with dc1:
-                if 'district' in state_df.columns:
-                    dist_data = state_df.groupby('district').size().reset_index(name='count').nlargest(10, 'count')
+                if details['districts'] is not None:
+                    dist_data = details['districts'].nlargest(10).reset_index(name='count')
                     fig_dist = px.bar(dist_data, x='count', y='district', orientation='h', title=f"Top Districts in {selected_state}")
-                    st.plotly_chart(fig_dist, use_container_width=True)
+                    st.plotly_chart(fig_dist, use_container_width=True, key="state_top_districts")
             
             with dc2:
                 if age_5_17_col and age_17_plus_col:
                     age_data = pd.DataFrame({
                         'Age Group': ['5-17', '17+'],
-                        'Count': [state_df[age_5_17_col].sum(), state_df[age_17_plus_col].sum()]
+                        'Count': [details['age_5_17'], details['age_17_plus']]
                     })
                     fig_age = px.pie(age_data, values='Count', names='Age Group', title=f"Age Distribution in {selected_state}")
-                    st.plotly_chart(fig_age, use_container_width=True)
+                    st.plotly_chart(fig_age, use_container_width=True, key="state_age_distribution")
 
         st.markdown("---")
         st.subheader("🔥 Data Density Heatmaps")
@@ -656,10 +850,10 @@ def main():
         h_col1, h_col2 = st.columns(2)
         
         with h_col1:
-            if 'state' in df.columns and 'district' in df.columns:
+            if aggs.by_state is not None and aggs.by_state_district is not None:
                 # State vs District Density (Top 5 States)
-                top_states = df.groupby('state').size().nlargest(5).index.tolist()
-                heatmap_df = df[df['state'].isin(top_states)].groupby(['state', 'district']).size().reset_index(name='count')
+                top_states = aggs.by_state.nlargest(5, 'records')['state'].tolist()
+                heatmap_df = aggs.by_state_district[aggs.by_state_district['state'].isin(top_states)].rename(columns={'records': 'count'})
                 
                 # To make it readable, maybe just filtered to top states
                 fig_density = px.density_heatmap(
@@ -671,22 +865,27 @@ def main():
                     color_continuous_scale='Viridis'
                 )
                 fig_density.update_layout(height=500)
-                st.plotly_chart(fig_density, use_container_width=True)
+                st.plotly_chart(fig_density, use_container_width=True, key="state_district_density")
         
         with h_col2:
-            if 'date' in df.columns and 'state' in df.columns:
+            if aggs.by_date_state is not None:
                  # Date vs State Heatmap
-                 date_state_df = df.groupby(['date', 'state']).size().reset_index(name='count')
-                 fig_time_heat = px.density_heatmap(
-                     date_state_df,
-                     x='date',
-                     y='state',
-                     z='count',
-                     title="Temporal Heatmap: Activity by State over Time",
-                     color_continuous_scale='Magma'
+                 # Roll daily counts up to weeks (starting Monday) to cut the cell count ~7x
+                 week_state_df = (
+                     aggs.by_date_state
+                     .assign(week=aggs.by_date_state['date'].dt.to_period('W').dt.start_time)
+                     .groupby(['week', 'state'], observed=True)['records'].sum()
+                     .reset_index()
                  )
-                 fig_time_heat.update_layout(height=500)
-                 st.plotly_chart(fig_time_heat, use_container_width=True)
+                 # Pivot the weekly counts into a dense matrix so Plotly draws the
+                 # cells directly instead of re-binning every row as density_heatmap does
+                 date_state_matrix = week_state_df.pivot(index='state', columns='week', values='records').fillna(0)
+                 fig_time_heat = session_figure('temporal_heatmap', build_time_heatmap_figure)
+                 with fig_time_heat.batch_update():
+                     fig_time_heat.data[0].z = date_state_matrix.to_numpy()
+                     fig_time_heat.data[0].x = date_state_matrix.columns
+                     fig_time_heat.data[0].y = date_state_matrix.index.astype(str)
+                 st.plotly_chart(fig_time_heat, use_container_width=True, key="temporal_heatmap")
     
     # Footer
     st.markdown("---")